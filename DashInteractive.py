@@ -1,27 +1,88 @@
 # app.py
+from functools import lru_cache
+
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, Patch
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
+import polars as pl
 import numpy as np
 
 # Generate sample dataset
-np.random.seed(42)
+rng = np.random.default_rng(42)
 n = 500
+REGIONS    = ['North', 'South', 'East', 'West']
+CATEGORIES = ['Electronics', 'Clothing', 'Food', 'Books']
+# Labels are drawn as int8 codes and wrapped in a Categorical directly,
+# so no object array of Python strings is ever materialized.
 df = pd.DataFrame({
-    'sales': np.random.exponential(1000, n),
-    'profit': np.random.normal(200, 100, n),
-    'region': np.random.choice(['North', 'South', 'East', 'West'], n),
-    'category': np.random.choice(['Electronics', 'Clothing', 'Food', 'Books'], n),
+    'sales': rng.exponential(1000, n),
+    'profit': rng.normal(200, 100, n),
+    'region': pd.Categorical.from_codes(
+        rng.integers(0, len(REGIONS), n, dtype=np.int8), REGIONS),
+    'category': pd.Categorical.from_codes(
+        rng.integers(0, len(CATEGORIES), n, dtype=np.int8), CATEGORIES),
     'date': pd.date_range('2024-01-01', periods=n, freq='D')
 })
-df['profit_margin'] = (df['profit'] / df['sales'].replace(0, 1)) * 100
+# Guarded margin division – where= leaves zero-sales rows at 0 without
+# materializing a zero-replaced copy of the sales column.
+pm = np.zeros(n)
+np.divide(df['profit'].values, df['sales'].values, out=pm,
+          where=df['sales'].values != 0)
+pm *= 100
+df['profit_margin'] = pm
 
 # Use absolute value or shift negative margins for size
 # Option: Use absolute margin for size, but color by sign
 df['abs_margin'] = df['profit_margin'].abs()
 df['margin_sign'] = np.where(df['profit_margin'] >= 0, 'Positive', 'Negative')
 
+# Narrow dtypes – float32 and second-precision dates are plenty here and
+# halve the bytes aggregated and serialized per interaction.
+for c in ('sales', 'profit', 'profit_margin', 'abs_margin'):
+    df[c] = df[c].astype(np.float32)
+df['date'] = df['date'].astype('datetime64[s]')
+
+# Lazy Polars frame for the callback – the query optimizer fuses the
+# filter with each aggregation and runs them multi-threaded over Arrow
+# buffers instead of re-filtering with pandas per interaction.
+PL = pl.from_pandas(df).lazy()
+
+# Figures are built once here and only their data arrays are patched in
+# the callback (dash.Patch), so the layout/template JSON is never rebuilt
+# in Python nor re-parsed in the browser per interaction.
+MARGIN_COLORS = {'Negative': '#e74c3c', 'Positive': '#2ecc71'}
+SIGNS = ('Negative', 'Positive')
+SIZEREF = 2.0 * df['abs_margin'].max() / (20.0 ** 2)   # px.scatter size_max=20
+
+scatter_template = go.Figure(layout=dict(
+    title='Sales vs Profit (Size = |Margin %|)',
+    xaxis_title='Total Sales ($)', yaxis_title='Profit ($)',
+    legend_title='Margin', transition_duration=500))
+for sign in SIGNS:
+    scatter_template.add_scatter(
+        x=[], y=[], mode='markers', name=sign,
+        marker=dict(color=MARGIN_COLORS[sign], sizemode='area',
+                    sizeref=SIZEREF, line=dict(width=1, color='white')),
+        customdata=[],
+        hovertemplate=('sales=%{x}<br>profit=%{y}<br>region=%{customdata[0]}'
+                       '<br>date=%{customdata[1]}'
+                       '<br>profit_margin=%{customdata[2]}'
+                       '<extra>%{fullData.name}</extra>'))
+
+bar_template = go.Figure(layout=dict(
+    title='Average Profit by Region',
+    xaxis_title='region', yaxis_title='Avg Profit ($)'))
+bar_template.add_bar(x=REGIONS, y=[0] * len(REGIONS),
+                     marker_color=px.colors.qualitative.Plotly[:len(REGIONS)])
+
+line_template = go.Figure(layout=dict(
+    title='Daily Sales Trend',
+    xaxis_title='date', yaxis_title='Total Sales ($)'))
+line_template.add_scatter(x=[], y=[], mode='lines+markers',
+                          line=dict(width=3, color='#3498db'))
+
 # Initialize Dash app
 app = dash.Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'])
 
@@ -34,8 +95,8 @@ app.layout = html.Div([
             html.Label("Select Region:"),
             dcc.Dropdown(
                 id='region-dropdown',
-                options=[{'label': r, 'value': r} for r in df['region'].unique()],
-                value=df['region'].unique().tolist(),
+                options=[{'label': r, 'value': r} for r in df['region'].cat.categories],
+                value=list(df['region'].cat.categories),
                 multi=True
             ),
         ], className="four columns"),
@@ -44,8 +105,8 @@ app.layout = html.Div([
             html.Label("Select Category:"),
             dcc.Dropdown(
                 id='category-dropdown',
-                options=[{'label': c, 'value': c} for c in df['category'].unique()],
-                value=df['category'].unique().tolist(),
+                options=[{'label': c, 'value': c} for c in df['category'].cat.categories],
+                value=list(df['category'].cat.categories),
                 multi=True
             ),
         ], className="four columns"),
@@ -57,6 +118,7 @@ app.layout = html.Div([
                 min=df['sales'].min(),
                 max=df['sales'].max(),
                 value=[df['sales'].min(), df['sales'].max()],
+                step=10,
                 marks={int(df['sales'].quantile(0.25)): '25%',
                        int(df['sales'].median()): '50%',
                        int(df['sales'].quantile(0.75)): '75%'},
@@ -67,16 +129,16 @@ app.layout = html.Div([
 
     html.Div([
         html.Div([
-            dcc.Graph(id='scatter-plot')
+            dcc.Graph(id='scatter-plot', figure=scatter_template)
         ], className="six columns"),
 
         html.Div([
-            dcc.Graph(id='bar-chart')
+            dcc.Graph(id='bar-chart', figure=bar_template)
         ], className="six columns"),
     ], className="row"),
 
     html.Div([
-        dcc.Graph(id='line-chart')
+        dcc.Graph(id='line-chart', figure=line_template)
     ], style={'marginTop': 30}),
 
     html.Footer([
@@ -96,47 +158,50 @@ app.layout = html.Div([
      Input('sales-slider', 'value')]
 )
 def update_charts(selected_regions, selected_categories, sales_range):
-    filtered_df = df[
-        df['region'].isin(selected_regions) &
-        df['category'].isin(selected_categories) &
-        (df['sales'] >= sales_range[0]) &
-        (df['sales'] <= sales_range[1])
-    ].copy()
+    # The whole update is a pure function of its inputs, so revisited
+    # selections (e.g. toggling a category off and back on) come straight
+    # from the memo cache. The slider moves in steps of 10, so rounding
+    # the bounds keeps the cache keys from fragmenting.
+    return _compute(frozenset(selected_regions or ()),
+                    frozenset(selected_categories or ()),
+                    round(sales_range[0], 1), round(sales_range[1], 1))
+
+
+@lru_cache(maxsize=64)
+def _compute(selected_regions, selected_categories, lo, hi):
+    f = PL.filter(
+        pl.col('region').is_in(sorted(selected_regions)) &
+        pl.col('category').is_in(sorted(selected_categories)) &
+        pl.col('sales').is_between(lo, hi)
+    )
+    filtered = f.collect()
 
     # --- SCATTER: Sales vs Profit (Size = |Profit Margin|) ---
-    scatter_fig = px.scatter(
-        filtered_df,
-        x='sales', y='profit',
-        color='margin_sign',  # Color by positive/negative
-        size='abs_margin',    # Use absolute value for size
-        hover_data=['region', 'date', 'profit_margin'],
-        title='Sales vs Profit (Size = |Margin %|)',
-        labels={'sales': 'Total Sales ($)', 'profit': 'Profit ($)'},
-        color_discrete_map={'Positive': '#2ecc71', 'Negative': '#e74c3c'}
-    )
-    scatter_fig.update_traces(marker=dict(line=dict(width=1, color='white')))
-    scatter_fig.update_layout(transition_duration=500, legend_title="Margin")
+    # Column slices come straight off the Arrow buffers; no conversion of
+    # the whole filtered frame back to pandas.
+    scatter_patch = Patch()
+    for i, sign in enumerate(SIGNS):
+        sub = filtered.filter(pl.col('margin_sign') == sign)
+        scatter_patch['data'][i]['x'] = sub['sales'].to_numpy()
+        scatter_patch['data'][i]['y'] = sub['profit'].to_numpy()
+        scatter_patch['data'][i]['marker']['size'] = sub['abs_margin'].to_numpy()
+        scatter_patch['data'][i]['customdata'] = (
+            sub.select('region', 'date', 'profit_margin').to_numpy())
 
     # --- BAR: Average Profit by Region ---
-    bar_data = filtered_df.groupby('region')['profit'].mean().reset_index()
-    bar_fig = px.bar(
-        bar_data, x='region', y='profit',
-        color='region', title='Average Profit by Region',
-        labels={'profit': 'Avg Profit ($)'},
-        color_discrete_sequence=px.colors.qualitative.Plotly
-    )
+    bar_data = f.group_by('region').agg(pl.col('profit').mean()).collect()
+    means = dict(zip(bar_data['region'], bar_data['profit']))
+    bar_patch = Patch()
+    bar_patch['data'][0]['y'] = [means.get(r, 0) for r in REGIONS]
 
     # --- LINE: Sales Trend Over Time ---
-    line_data = filtered_df.groupby('date')['sales'].sum().reset_index()
-    line_fig = px.line(
-        line_data, x='date', y='sales',
-        title='Daily Sales Trend',
-        labels={'sales': 'Total Sales ($)'},
-        markers=True
-    )
-    line_fig.update_traces(line=dict(width=3, color='#3498db'))
+    line_data = (f.group_by('date').agg(pl.col('sales').sum())
+                 .sort('date').collect())
+    line_patch = Patch()
+    line_patch['data'][0]['x'] = line_data['date'].to_numpy()
+    line_patch['data'][0]['y'] = line_data['sales'].to_numpy()
 
-    return scatter_fig, bar_fig, line_fig
+    return scatter_patch, bar_patch, line_patch
 
 
 # Run app
@@ -3,25 +3,41 @@ import plotly.express as px
 import pandas as pd
 import numpy as np
 
-# Generate sample data
-np.random.seed(42)
+# Generate sample data – categories are drawn as int8 codes and gathered
+# into a Categorical, skipping the slow object-array path of
+# np.random.choice on a Python list.
+rng = np.random.default_rng(42)
+n = 100
+CATEGORIES = ['A', 'B', 'C']
 df = pd.DataFrame({
-    'x': np.random.randn(100),
-    'y': np.random.randn(100),
-    'category': np.random.choice(['A', 'B', 'C'], 100),
-    'size': np.random.rand(100) * 30 + 10
+    'x': rng.standard_normal(n),
+    'y': rng.standard_normal(n),
+    'category': pd.Categorical.from_codes(
+        rng.integers(0, len(CATEGORIES), n, dtype=np.int8), CATEGORIES),
+    'size': rng.random(n) * 30 + 10
 })
 
-# Create interactive scatter plot with Plotly Express
-fig = px.scatter(
-    df, 
-    x='x', 
-    y='y',
-    color='category',
-    size='size',
-    hover_data=['x', 'y'],
+# Create interactive scatter plot – Scattergl renders through WebGL, so
+# pan/zoom stays smooth even with tens of thousands of points (no DOM
+# node per marker). The default hover already shows x/y, so the old
+# hover_data=['x', 'y'] duplication is gone.
+codes = df['category'].cat.codes.to_numpy()
+palette = px.colors.qualitative.Plotly
+fig = go.Figure()
+for code, cat in enumerate(CATEGORIES):
+    m = codes == code
+    fig.add_trace(go.Scattergl(
+        x=df['x'].to_numpy()[m],
+        y=df['y'].to_numpy()[m],
+        mode='markers', name=cat,
+        marker=dict(size=df['size'].to_numpy()[m], sizemode='area',
+                    sizeref=2.0 * df['size'].max() / (20.0 ** 2),
+                    color=palette[code])
+    ))
+fig.update_layout(
     title='Interactive Scatter Plot with Plotly',
-    labels={'x': 'X Axis', 'y': 'Y Axis'},
+    xaxis_title='X Axis', yaxis_title='Y Axis',
+    legend_title='category',
     template='plotly_dark'
 )
 